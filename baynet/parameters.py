@@ -4,6 +4,7 @@ from typing import Dict, List, Optional, Tuple, Union
 import igraph
 import numpy as np
 import pandas as pd
+from pandas.api.types import is_integer_dtype
 
 
 class ConditionalProbabilityTable:
@@ -48,6 +49,15 @@ class ConditionalProbabilityTable:
             raise NotImplementedError(f"Parameter Estimation method {method} not implemented.")
         return cpt
 
+    @classmethod
+    def estimate_from_codes(
+        cls, vertex: igraph.Vertex, node_codes: np.ndarray, parent_codes: List[np.ndarray]
+    ) -> "ConditionalProbabilityTable":
+        """Create a CPT, populated with MLE parameters based on integer level codes."""
+        cpt = cls(vertex)
+        cpt.mle_estimate_codes(node_codes, parent_codes)
+        return cpt
+
     def dfe_estimate(
         self,
         data: pd.DataFrame,
@@ -58,7 +68,7 @@ class ConditionalProbabilityTable:
         """Predict parameters using DFE method."""
         self.rescale_probabilities()
         for _, sample in (
-            data.apply(lambda x: x.cat.codes)
+            data.apply(_level_codes)
             .sample(n=iterations, replace=True, random_state=seed)
             .iterrows()
         ):
@@ -70,9 +80,23 @@ class ConditionalProbabilityTable:
 
     def mle_estimate(self, data: pd.DataFrame) -> None:
         """Predict parameters using the MLE method."""
-        matches = data.apply(lambda x: x.cat.codes).groupby([*self.parents, self.name]).size()
-        for indexer, count in matches.iteritems():
-            self.array[indexer] = count
+        self.mle_estimate_codes(
+            _level_codes(data[self.name]).to_numpy(),
+            [_level_codes(data[parent]).to_numpy() for parent in self.parents],
+        )
+
+    def mle_estimate_codes(self, node_codes: np.ndarray, parent_codes: List[np.ndarray]) -> None:
+        """Predict parameters using the MLE method, from integer level codes.
+
+        `parent_codes` must be given in the same order as `self.parents`.
+        Rows with a missing value (code -1) in any column are ignored.
+        """
+        codes = np.stack([*parent_codes, node_codes]).astype(np.intp, copy=False)
+        codes = codes[:, np.all(codes >= 0, axis=0)]
+        counts = np.bincount(
+            np.ravel_multi_index(tuple(codes), self.array.shape), minlength=self.array.size
+        )
+        self.array = counts.reshape(self.array.shape).astype(float)
         self.rescale_probabilities()
 
     def rescale_probabilities(self) -> None:
@@ -94,12 +118,15 @@ class ConditionalProbabilityTable:
     def sample(self, incomplete_data: pd.DataFrame) -> pd.DataFrame:
         """Sample based on parent values."""
         parent_values_array = incomplete_data[self.parents].apply(lambda x: x.cat.codes).values
-        random_vector = np.random.uniform(size=parent_values_array.shape[0])
-        parent_values: List[Tuple[int, ...]] = list(map(tuple, parent_values_array))
-        out_array = _sample_cpt(self.cumsum_array, parent_values, random_vector)
+        out_array = self.sample_array(parent_values_array)
         dtype = pd.CategoricalDtype(self.levels, ordered=True)
         return pd.Categorical.from_codes(codes=out_array, dtype=dtype)
 
+    def sample_array(self, parent_values: np.ndarray) -> np.ndarray:
+        """Sample level codes based on an array of parent level codes, one column per parent."""
+        random_vector = np.random.uniform(size=parent_values.shape[0])
+        return _sample_cpt(self.cumsum_array, parent_values, random_vector)
+
     def sample_parameters(
         self,
         alpha: Optional[float] = None,
@@ -138,15 +165,25 @@ class ConditionalProbabilityTable:
         self.rescale_probabilities()
 
 
+def _level_codes(column: pd.Series) -> pd.Series:
+    """Return level codes for a column of either categorical values or integer codes."""
+    if is_integer_dtype(column):
+        return column
+    return column.cat.codes
+
+
 def _sample_cpt(
-    cpt: np.ndarray, parent_values: List[Tuple[int, ...]], random_vector: np.ndarray
+    cpt: np.ndarray,
+    parent_values: Union[np.ndarray, List[Tuple[int, ...]]],
+    random_vector: np.ndarray,
 ) -> np.ndarray:
     """Sample given cpt based on rows of parent values and random vector."""
-    out_vector = np.zeros(random_vector.shape).astype(int)
-    for row_idx in range(random_vector.shape[0]):
-        probs = cpt[parent_values[row_idx]]
-        out_vector[row_idx] = np.argmax(random_vector[row_idx] < probs)
-    return out_vector
+    parent_values = np.asarray(parent_values, dtype=int).reshape(
+        random_vector.shape[0], cpt.ndim - 1
+    )
+    # One row of cumulative probabilities per sample (or a single row if there are no parents)
+    probs = cpt[tuple(parent_values.T)]
+    return np.argmax(random_vector[:, np.newaxis] < probs, axis=-1)
 
 
 class ConditionalProbabilityDistribution:
@@ -181,10 +218,13 @@ class ConditionalProbabilityDistribution:
             weights = [-2.0, -0.5, 0.5, 2.0]
         self.array = np.random.choice(weights, len(self.parents))
 
-    def sample(self, incomplete_data: pd.DataFrame) -> pd.DataFrame:
+    def sample(self, incomplete_data: pd.DataFrame) -> np.ndarray:
         """Sample column based on parent columns in incomplete data matrix."""
-        noise = np.random.normal(loc=self.mean, scale=self.std, size=incomplete_data.shape[0])
+        return self.sample_array(incomplete_data[self.parents].to_numpy())
+
+    def sample_array(self, parent_values: np.ndarray) -> np.ndarray:
+        """Sample values based on an array of parent values, one column per parent."""
+        noise = np.random.normal(loc=self.mean, scale=self.std, size=parent_values.shape[0])
         if len(self.parents) == 0:
             return noise
-        parent_values = incomplete_data[self.parents]
         return parent_values.dot(self.array) + noise
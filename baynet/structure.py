@@ -1,11 +1,25 @@
 """Graph object."""
 from __future__ import annotations
+from collections import defaultdict
 from copy import deepcopy
-import itertools
+from functools import wraps
 from itertools import combinations
 from pathlib import Path
 from string import ascii_uppercase
-from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Type, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    cast,
+)
 
 import igraph
 import numpy as np
@@ -16,7 +30,11 @@ from typing_extensions import Literal
 from baynet.utils import dag_io, visualisation
 
 from .interventions import odds_ratio_aggregator
-from .parameters import ConditionalProbabilityDistribution, ConditionalProbabilityTable
+from .parameters import (
+    ConditionalProbabilityDistribution,
+    ConditionalProbabilityTable,
+    _level_codes,
+)
 
 
 def _nodes_sorted(nodes: Union[List[int], List[str], List[object]]) -> List[str]:
@@ -44,21 +62,143 @@ def _edges_from_modelstring(modelstring: str) -> List[Tuple[str, str]]:
     return edges
 
 
-def _name_node(index: int) -> str:
-    chars: List[str] = []
-    if index == 0:
-        return "A"
-    while index > 0:
-        index, mod = divmod(index, 26)
-        chars.insert(0, ascii_uppercase[mod])
-    return ''.join(chars)
+_NODE_NAMES: Dict[int, str] = {}
 
 
-def _graph_method_wrapper(dag: DAG, func: Callable) -> Callable:
-    """Call an igraph.Graph function, (where applicable) return DAG instead of igraph.Graph."""
+def _name_node(index: int) -> str:
+    name = _NODE_NAMES.get(index)
+    if name is not None:
+        return name
+    chars: List[str] = []
+    remainder = index
+    while remainder > 0:
+        remainder, mod = divmod(remainder, 26)
+        chars.append(ascii_uppercase[mod])
+    name = ''.join(reversed(chars)) if chars else "A"
+    _NODE_NAMES[index] = name
+    return name
+
+
+def _undirected_edge(node_a: str, node_b: str) -> Tuple[str, str]:
+    return (node_a, node_b) if node_a < node_b else (node_b, node_a)
+
+
+def _meek_forced(
+    source: str,
+    target: str,
+    parents: Dict[str, Set[str]],
+    children: Dict[str, Set[str]],
+    undirected: Dict[str, Set[str]],
+    adjacent: Dict[str, Set[str]],
+) -> bool:
+    """Check whether Meek's rules force the undirected edge source-target to be source->target."""
+    # R1: a->source-target, a and target nonadjacent
+    if parents[source] - adjacent[target] - {target}:
+        return True
+    # R2: source->a->target
+    if children[source] & parents[target]:
+        return True
+    # R3: source-a->target, source-b->target, a and b nonadjacent
+    candidates = undirected[source] & parents[target]
+    if any(b not in adjacent[a] for a, b in combinations(candidates, 2)):
+        return True
+    # R4: source-a->b->target, a and target nonadjacent, source and b adjacent
+    for node_a in undirected[source] - adjacent[target] - {target}:
+        if children[node_a] & parents[target] & adjacent[source]:
+            return True
+    return False
+
+
+def _apply_meek_rules(
+    directed: Set[Tuple[str, str]], undirected: Set[Tuple[str, str]]
+) -> Tuple[Set[Tuple[str, str]], Set[Tuple[str, str]]]:
+    """Orient undirected edges of a partially directed graph using Meek's rules, to fixpoint."""
+    directed, undirected = set(directed), set(undirected)
+    changed = True
+    while changed:
+        changed = False
+        parents: Dict[str, Set[str]] = defaultdict(set)
+        children: Dict[str, Set[str]] = defaultdict(set)
+        neighbours: Dict[str, Set[str]] = defaultdict(set)
+        for source, target in directed:
+            parents[target].add(source)
+            children[source].add(target)
+        for node_a, node_b in undirected:
+            neighbours[node_a].add(node_b)
+            neighbours[node_b].add(node_a)
+        adjacent: Dict[str, Set[str]] = defaultdict(set)
+        for node in set(parents) | set(children) | set(neighbours):
+            adjacent[node] = parents[node] | children[node] | neighbours[node]
+        for node_a, node_b in sorted(undirected):
+            for source, target in ((node_a, node_b), (node_b, node_a)):
+                if _meek_forced(source, target, parents, children, neighbours, adjacent):
+                    undirected.remove((node_a, node_b))
+                    directed.add((source, target))
+                    changed = True
+                    break
+            if changed:
+                break
+    return directed, undirected
+
+
+def _is_acyclic(nodes: List[str], edges: Set[Tuple[str, str]]) -> bool:
+    index = {node: idx for idx, node in enumerate(nodes)}
+    graph = igraph.Graph(
+        n=len(nodes),
+        edges=[(index[source], index[target]) for source, target in edges],
+        directed=True,
+    )
+    return graph.is_dag()
+
+
+def _pdag_extensions(
+    nodes: List[str], directed: Set[Tuple[str, str]], undirected: Set[Tuple[str, str]]
+) -> Iterator[Set[Tuple[str, str]]]:
+    """Yield the edge sets of all DAGs consistent with a partially directed graph."""
+    directed, undirected = _apply_meek_rules(directed, undirected)
+    if not _is_acyclic(nodes, directed):
+        return
+    if not undirected:
+        yield directed
+        return
+    node_a, node_b = min(undirected)
+    remaining = undirected - {(node_a, node_b)}
+    for edge in ((node_a, node_b), (node_b, node_a)):
+        yield from _pdag_extensions(nodes, directed | {edge}, remaining)
+
+
+FuncT = TypeVar("FuncT", bound=Callable[..., Any])
+
+
+def _cached_on_structure(func: FuncT) -> FuncT:
+    """Memoise a DAG method's result until the structure of the DAG changes."""
+
+    @wraps(func)
+    def wrapped_method(dag: DAG, *args: Any, **kwargs: Any) -> Any:
+        # pylint: disable=protected-access
+        state = dag._structure_state()
+        if state != dag._cache_state:
+            dag._structure_cache = {}
+            dag._cache_state = state
+        key = (func.__name__, args, tuple(sorted(kwargs.items())))
+        if key not in dag._structure_cache:
+            dag._structure_cache[key] = func(dag, *args, **kwargs)
+        result = dag._structure_cache[key]
+        # Don't let callers modify the cached set
+        return set(result) if isinstance(result, set) else result
+
+    return cast(FuncT, wrapped_method)
+
+
+def _graph_method_wrapper(dag: DAG, name: str) -> Callable:
+    """Call an igraph.Graph function, (where applicable) return DAG instead of igraph.Graph.
+
+    The method is looked up on `dag.graph` at call time, so the wrapper stays valid
+    if `dag.graph` is replaced.
+    """
 
     def wrapped_method(*args: Tuple[Any], **kwargs: Dict[Any, Any]) -> Union[Callable, DAG]:
-        res = func(*args, **kwargs)
+        res = getattr(dag.graph, name)(*args, **kwargs)
         if isinstance(res, igraph.Graph):
             dag_copy = dag.copy()
             dag_copy.graph = res
@@ -75,6 +215,9 @@ class DAG:
     def __init__(self, graph_or_buf: Optional[Union[bytes, igraph.Graph]] = None) -> None:
         """Create a DAG object."""
         self.graph = igraph.Graph(directed=True, vertex_attrs={"CPD": None})
+        self._name_to_index: Dict[str, int] = {}
+        self._structure_cache: Dict[Tuple, Any] = {}
+        self._cache_state: Optional[Tuple] = None
         if isinstance(graph_or_buf, igraph.Graph):
             self.graph = graph_or_buf
             assert self.is_dag()
@@ -82,19 +225,35 @@ class DAG:
         elif isinstance(graph_or_buf, bytes):
             dag_io.buf_to_dag(graph_or_buf, dag=self)
 
-    def __getattribute__(self, name: str) -> Any:
-        """Overwrite object.__getattribute__ to fall back on igraph.Graph where necessary."""
+    def __getattr__(self, name: str) -> Any:
+        """Fall back on igraph.Graph for attributes not found on the DAG."""
+        if name == "graph":
+            # Not yet set (e.g. during unpickling), avoid recursing into self.graph
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
         try:
-            return super().__getattribute__(name)
-        except AttributeError as errormsg:
-            try:
-                attr = self.graph.__getattribute__(name)
-                if callable(attr) and not isinstance(attr, (igraph.VertexSeq, igraph.EdgeSeq)):
-                    # Anywhere a function *might* return a Graph, return a DAG instead
-                    return _graph_method_wrapper(self, attr)
-                return attr
-            except AttributeError:
-                raise errormsg
+            attr = getattr(self.graph, name)
+        except AttributeError:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            ) from None
+        if callable(attr) and not isinstance(attr, (igraph.VertexSeq, igraph.EdgeSeq)):
+            # Anywhere a function *might* return a Graph, return a DAG instead
+            wrapped = _graph_method_wrapper(self, name)
+            # Cache on the instance so later lookups don't reach __getattr__
+            setattr(self, name, wrapped)
+            return wrapped
+        return attr
+
+    def _structure_state(self) -> Tuple:
+        """Return a key which changes whenever the structure or node names of the DAG change.
+
+        Read from the graph itself, so changes made directly to `self.graph` are caught too.
+        """
+        return (
+            self.graph.is_directed(),
+            tuple(self._node_names()),
+            tuple(self.graph.get_edgelist()),
+        )
 
     def __reduce__(self) -> Tuple:
         """Return representation for Pickle."""
@@ -121,18 +280,17 @@ class DAG:
         cls, amat: Union[np.ndarray, List[List[int]]], colnames: Optional[List[str]] = None
     ) -> "DAG":
         """Instantiate a Graph object from an adjacency matrix."""
-        if isinstance(amat, np.ndarray):
-            amat = amat.tolist()
+        amat = np.asarray(amat)
         if colnames is None:
-            colnames = [_name_node(i) for i in range(len(amat))]
+            colnames = [_name_node(i) for i in range(amat.shape[0])]
         dag = cls()
         dag.add_vertices(colnames)
+        colnames = [str(name) for name in colnames]
+        parents, targets = np.nonzero(amat)
         dag.add_edges(
             [
-                (str(colnames[parent_idx]), str(colnames[target_idx]))
-                for parent_idx, row in enumerate(amat)
-                for target_idx, val in enumerate(row)
-                if val
+                (colnames[parent_idx], colnames[target_idx])
+                for parent_idx, target_idx in zip(parents.tolist(), targets.tolist())
             ]
         )
         return dag
@@ -161,25 +319,24 @@ class DAG:
     @property
     def dtype(self) -> Optional[str]:
         """Return data type of parameterised network."""
-        if all(isinstance(vertex["CPD"], ConditionalProbabilityTable) for vertex in self.vs):
-            return "discrete"
-        elif all(
-            isinstance(vertex["CPD"], ConditionalProbabilityDistribution) for vertex in self.vs
-        ):
-            return "continuous"
-        elif all(
-            isinstance(
-                vertex["CPD"], (ConditionalProbabilityTable, ConditionalProbabilityDistribution)
-            )
-            for vertex in self.vs
-        ):
+        has_cpt = has_cpd = False
+        for cpd in self.graph.vs["CPD"] if self.graph.vcount() else []:
+            if isinstance(cpd, ConditionalProbabilityTable):
+                has_cpt = True
+            elif isinstance(cpd, ConditionalProbabilityDistribution):
+                has_cpd = True
+            else:
+                return None
+        if has_cpt and has_cpd:
             return "mixed"
-        return None
+        if has_cpd:
+            return "continuous"
+        return "discrete"
 
     @property
     def nodes(self) -> Set[str]:
         """Return a set of the names of all nodes in the network."""
-        return {self.get_node_name(v.index) for v in self.vs}
+        return set(self._node_names())
 
     @property
     def edges(self) -> Set[Tuple[str, str]]:
@@ -196,12 +353,18 @@ class DAG:
     @property
     def directed_edges(self) -> Set[Tuple[str, str]]:
         """Return forward edges in the Graph."""
-        return {(self.get_node_name(e.source), self.get_node_name(e.target)) for e in self.es}
+        names = self._node_names()
+        return {(names[source], names[target]) for source, target in self.graph.get_edgelist()}
 
     @property
     def reversed_edges(self) -> Set[Tuple[str, str]]:
         """Return reversed edges in the Graph."""
-        return {(self.get_node_name(e.target), self.get_node_name(e.source)) for e in self.es}
+        names = self._node_names()
+        return {(names[target], names[source]) for source, target in self.graph.get_edgelist()}
+
+    def _node_names(self) -> List[str]:
+        """Return all node names, ordered by node index."""
+        return self.graph.vs["name"] if self.graph.vcount() else []
 
     def get_node_name(self, node: int) -> str:
         """Convert node index to node name."""
@@ -209,7 +372,31 @@ class DAG:
 
     def get_node_index(self, node: str) -> int:
         """Convert node name to node index."""
-        return self.vs["name"].index(node)
+        index = self._name_to_index.get(node)
+        if index is None or index >= self.graph.vcount() or self.graph.vs[index]["name"] != node:
+            # Cache is missing or stale (e.g. graph modified directly), so rebuild it
+            self._name_to_index = {name: idx for idx, name in enumerate(self._node_names())}
+            index = self._name_to_index.get(node)
+            if index is None:
+                raise ValueError(f"{node} is not a node in the DAG")
+        return index
+
+    def add_vertices(  # pylint: disable=invalid-name
+        self, n: Union[int, str, List[str]], attributes: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Add vertices, keeping the node name to index cache up to date.
+
+        Overrides: igraph.Graph.add_vertices
+        """
+        n_existing = self.graph.vcount()
+        if not isinstance(n, (int, str)):
+            n = list(n)
+        self.graph.add_vertices(n, attributes)
+        if isinstance(n, int) or len(self._name_to_index) != n_existing:
+            return
+        names = [n] if isinstance(n, str) else n
+        for index, name in enumerate(names, start=n_existing):
+            self._name_to_index[name] = index
 
     def get_node(self, name_or_index: Union[str, int]) -> igraph.Vertex:
         """Get Vertex object by node name."""
@@ -222,39 +409,62 @@ class DAG:
 
         Overrides: igraph.Graph.add_edge
         """
-        if (source, target) in self.edges:
+        if self.graph.get_eid(source, target, error=False) != -1:
             raise ValueError(f"Edge {source}->{target} already exists in Graph")
+        source_idx = self.get_node_index(source) if isinstance(source, str) else source
+        # The new edge closes a cycle iff source is already reachable from target
+        if source_idx in self.graph.subcomponent(target, mode="OUT"):
+            raise ValueError(f"Edge {source}->{target} would create a cycle")
         self.graph.add_edge(source, target)
-        assert self.is_dag()
 
     def add_edges(self, edges: Union[Set[Tuple[str, str]], List[Tuple[str, str]]]) -> None:
         """Add multiple edges from a list of tuples, each containing (from, to) as strings."""
+        existing_edges = self.directed_edges
         for source, target in edges:
-            if (source, target) in self.edges:
+            if (source, target) in existing_edges:
                 raise ValueError(f"Edge {source}->{target} already exists in Graph")
         if len(edges) != len(set(edges)):
             raise ValueError("Edges list contains duplicates")
+        n_edges = self.graph.ecount()
+        self.graph.add_edges(edges)
+        if not self.is_dag():
+            # New edges are appended, so removing the highest edge ids restores the graph
+            self.graph.delete_edges(range(n_edges, self.graph.ecount()))
+            raise ValueError("Edges list would create a cycle")
+
+    def _add_edges_unchecked(
+        self, edges: Union[Set[Tuple[str, str]], List[Tuple[str, str]]]
+    ) -> None:
+        """Add edges without checking for duplicates or cycles.
+
+        Only for edges already known to be new and to keep the graph acyclic.
+        """
         self.graph.add_edges(edges)
-        assert self.is_dag()
 
     def get_numpy_adjacency(self, skeleton: bool = False) -> np.ndarray:
         """Obtain adjacency matrix as a numpy (boolean) array."""
-        if skeleton:
-            amat = self.get_numpy_adjacency()
-            return amat | amat.T
-        return np.array(list(self.get_adjacency()), dtype=bool)
-
+        n_nodes = self.graph.vcount()
+        edges = np.asarray(self.graph.get_edgelist(), dtype=np.intp).reshape(-1, 2)
+        amat = np.zeros((n_nodes, n_nodes), dtype=bool)
+        amat[edges[:, 0], edges[:, 1]] = True
+        if skeleton or not self.graph.is_directed():
+            amat |= amat.T
+        return amat
+
+    @_cached_on_structure
     def get_modelstring(self) -> str:
         """Obtain modelstring representation of stored graph."""
-        modelstring = ""
-        for node in _nodes_sorted(list(self.nodes)):
-            parents = _nodes_sorted(
-                [v["name"] for v in self.get_ancestors(node, only_parents=True)]
-            )
-            modelstring += f"[{node}"
-            modelstring += f"|{':'.join(parents)}" if parents else ""
-            modelstring += "]"
-        return modelstring
+        names = self._node_names()
+        parents: List[List[str]] = [[] for _ in names]
+        for source, target in self.graph.get_edgelist():
+            parents[target].append(names[source])
+        modelstring = []
+        for node_idx in sorted(range(len(names)), key=lambda idx: str(names[idx])):
+            node_parents = _nodes_sorted(parents[node_idx])
+            modelstring.append(f"[{names[node_idx]}")
+            modelstring.append(f"|{':'.join(node_parents)}" if node_parents else "")
+            modelstring.append("]")
+        return "".join(modelstring)
 
     def get_ancestors(
         self, node: Union[str, int, igraph.Vertex], only_parents: bool = False
@@ -265,12 +475,11 @@ class DAG:
             node = self.get_node_index(node)
         elif isinstance(node, igraph.Vertex):
             node = node.index
-        order = 1 if only_parents else len(self.vs)
-        ancestors = list(self.neighborhood(vertices=node, order=order, mode="IN"))
-        ancestors.remove(node)
-        if len(ancestors) <= 1:
-            return igraph.VertexSeq(self.graph, ancestors)
-        return self.vs[sorted(ancestors)]
+        if only_parents:
+            relatives = self.graph.predecessors(node)
+        else:
+            relatives = [idx for idx in self.graph.subcomponent(node, mode="IN") if idx != node]
+        return igraph.VertexSeq(self.graph, sorted(relatives))
 
     def get_descendants(
         self, node: Union[str, int, igraph.Vertex], only_children: bool = False
@@ -281,12 +490,11 @@ class DAG:
             node = self.get_node_index(node)
         elif isinstance(node, igraph.Vertex):
             node = node.index
-        order = 1 if only_children else len(self.vs)
-        ancestors = list(self.neighborhood(vertices=node, order=order, mode="OUT"))
-        ancestors.remove(node)
-        if len(ancestors) <= 1:
-            return igraph.VertexSeq(self.graph, ancestors)
-        return self.vs[sorted(ancestors)]
+        if only_children:
+            relatives = self.graph.successors(node)
+        else:
+            relatives = [idx for idx in self.graph.subcomponent(node, mode="OUT") if idx != node]
+        return igraph.VertexSeq(self.graph, sorted(relatives))
 
     def are_neighbours(
         self, node_a: Union[igraph.Vertex, str, int], node_b: Union[igraph.Vertex, str, int]
@@ -296,22 +504,27 @@ class DAG:
             node_a = self.get_node(node_a)
         if not isinstance(node_b, igraph.Vertex):
             node_b = self.get_node(node_b)
-        return node_a.index in self.neighborhood(vertices=node_b)
+        source, target = node_a.index, node_b.index
+        return self.graph.are_connected(source, target) or self.graph.are_connected(target, source)
 
+    @_cached_on_structure
     def get_v_structures(self, include_shielded: bool = False) -> Set[Tuple[str, str, str]]:
         """Return a list of the Graph's v-structures in tuple form; (a,b,c) = a->b<-c."""
+        names = self._node_names()
+        if not include_shielded:
+            skeleton = self.get_numpy_adjacency(skeleton=True)
         v_structures: List[Tuple[str, str, str]] = []
         for node in self.nodes:
             all_parents = self.get_ancestors(node, only_parents=True)
             all_pairs = combinations(all_parents, 2)
-            all_pairs = [sorted(pair, key=lambda x: x['name']) for pair in all_pairs]
+            all_pairs = [sorted(pair, key=lambda x: names[x.index]) for pair in all_pairs]
             if include_shielded:
-                node_v_structures = [(a["name"], node, b["name"]) for a, b in all_pairs]
+                node_v_structures = [(names[a.index], node, names[b.index]) for a, b in all_pairs]
             else:
                 node_v_structures = [
-                    (a["name"], node, b["name"])
+                    (names[a.index], node, names[b.index])
                     for a, b in all_pairs
-                    if not self.are_neighbours(a, b)
+                    if not skeleton[a.index, b.index]
                 ]
             v_structures += node_v_structures
         return set(v_structures)
@@ -324,9 +537,12 @@ class DAG:
         seed: Optional[int] = None,
     ) -> DAG:
         """Populate continuous conditional distributions for each node."""
-        for vertex in self.vs:
-            vertex["CPD"] = ConditionalProbabilityDistribution(vertex, mean=mean, std=std)
-            vertex["CPD"].sample_parameters(weights=possible_weights, seed=seed)
+        cpds = []
+        for vertex in self.graph.vs:
+            cpd = ConditionalProbabilityDistribution(vertex, mean=mean, std=std)
+            cpd.sample_parameters(weights=possible_weights, seed=seed)
+            cpds.append(cpd)
+        self.graph.vs["CPD"] = cpds
         return self
 
     def generate_levels(
@@ -343,9 +559,10 @@ class DAG:
         if max_levels is None:
             max_levels = 3
         assert max_levels >= min_levels >= 2
-        for vertex in self.vs:
-            n_levels = np.random.randint(min_levels, max_levels + 1)
-            vertex["levels"] = list(map(str, range(n_levels)))
+        self.graph.vs["levels"] = [
+            list(map(str, range(np.random.randint(min_levels, max_levels + 1))))
+            for _ in range(self.graph.vcount())
+        ]
         return self
 
     def generate_discrete_parameters(
@@ -367,9 +584,12 @@ class DAG:
             self.generate_levels(min_levels, max_levels, seed)
         if seed is not None:
             np.random.seed(seed)
-        for vertex in self.vs:
-            vertex["CPD"] = ConditionalProbabilityTable(vertex)
-            vertex["CPD"].sample_parameters(alpha=alpha, normalise_alpha=normalise_alpha)
+        cpds = []
+        for vertex in self.graph.vs:
+            cpd = ConditionalProbabilityTable(vertex)
+            cpd.sample_parameters(alpha=alpha, normalise_alpha=normalise_alpha)
+            cpds.append(cpd)
+        self.graph.vs["CPD"] = cpds
         return self
 
     def estimate_parameters(
@@ -380,47 +600,53 @@ class DAG:
         method_args: Optional[Dict[str, Union[int, float]]] = None,
     ) -> None:
         """Estimate conditional probabilities based on supplied data."""
-        data = data.copy()
+        names = self._node_names()
+        # Converted columns are kept separately, rather than copying and modifying `data`
+        converted: Dict[str, pd.Series] = {}
         if infer_levels:
             if all(is_categorical_dtype(data[col]) for col in data.columns):
-                self.vs['levels'] = [list(dtype.categories) for dtype in data.dtypes]
+                self.graph.vs['levels'] = [list(data[name].cat.categories) for name in names]
             else:
-                for vertex in self.vs:
-                    if not (
-                        is_integer_dtype(data[vertex['name']])
-                        or is_string_dtype(data[vertex['name']])
-                    ):
-                        raise ValueError(
-                            f"Unrecognised DataFrame dtype: {data[vertex['name']].dtype}"
-                        )
-                    vertex_categories = sorted(data[vertex['name']].unique().astype(str))
-                    column = pd.Categorical(
-                        data[vertex['name']].astype(str), categories=vertex_categories
-                    )
-                    vertex['levels'] = vertex_categories
-                    data[vertex['name']] = column
+                all_levels = []
+                for name in names:
+                    if not (is_integer_dtype(data[name]) or is_string_dtype(data[name])):
+                        raise ValueError(f"Unrecognised DataFrame dtype: {data[name].dtype}")
+                    categories = sorted(data[name].unique().astype(str))
+                    converted[name] = data[name].astype(str).astype(pd.CategoricalDtype(categories))
+                    all_levels.append(categories)
+                self.graph.vs['levels'] = all_levels
         else:
             try:
                 if not all(isinstance(dtype, pd.CategoricalDtype) for dtype in data.dtypes):
-                    for vertex in self.vs:
-                        if is_integer_dtype(data[vertex['name']]):
-                            cat_dtype = pd.CategoricalDtype(vertex['levels'], ordered=True)
-                            data[vertex['name']] = pd.Categorical.from_codes(
-                                codes=data[vertex['name']], dtype=cat_dtype
-                            )
-                        elif is_string_dtype(data[vertex['name']]):
-                            data[vertex['name']] = pd.Categorical(
-                                data[vertex['name']], categories=vertex['levels']
-                            )
+                    # Integer columns are used directly as level codes
+                    for name, levels in zip(names, self.graph.vs['levels']):
+                        if is_string_dtype(data[name]):
+                            converted[name] = data[name].astype(pd.CategoricalDtype(levels))
             except KeyError:
                 raise ValueError(
                     "`estimate_parameters()` requires levels be defined or `infer_levels=True`"
                 )
 
-        for vertex in self.vs:
-            vertex['CPD'] = ConditionalProbabilityTable.estimate(
-                vertex, data=data, method=method, method_args=method_args
+        if method != "mle":
+            if converted:
+                data = data.assign(**converted)
+            self.graph.vs['CPD'] = [
+                ConditionalProbabilityTable.estimate(
+                    vertex, data=data, method=method, method_args=method_args
+                )
+                for vertex in self.graph.vs
+            ]
+            return
+        codes = {name: _level_codes(converted.get(name, data[name])).to_numpy() for name in names}
+        cpds = []
+        for node_idx, name in enumerate(names):
+            parents = [names[idx] for idx in self.graph.predecessors(node_idx)]
+            cpds.append(
+                ConditionalProbabilityTable.estimate_from_codes(
+                    self.graph.vs[node_idx], codes[name], [codes[parent] for parent in parents]
+                )
             )
+        self.graph.vs['CPD'] = cpds
 
     def sample(self, n_samples: int, seed: Optional[int] = None) -> pd.DataFrame:
         """Sample n_samples rows of data from the graph."""
@@ -428,22 +654,30 @@ class DAG:
             np.random.seed(seed)
         sorted_nodes = self.topological_sorting(mode="out")
         dtype: Type
-        if all(isinstance(vertex['CPD'], ConditionalProbabilityTable) for vertex in self.vs):
+        network_dtype = self.dtype
+        if network_dtype == "discrete":
             dtype = int
-        elif all(
-            isinstance(vertex['CPD'], ConditionalProbabilityDistribution) for vertex in self.vs
-        ):
+        elif network_dtype == "continuous":
             dtype = float
         else:
             raise RuntimeError("DAG requires parameters before sampling is possible.")
-        data = pd.DataFrame(
-            np.zeros((n_samples, len(self.nodes))).astype(dtype),
-            columns=self.vs["name"],
-        )
+        names = self._node_names()
+        cpds = self.graph.vs["CPD"]
+        data = np.empty((n_samples, len(names)), dtype=dtype)
         for node_idx in sorted_nodes:
-            data.iloc[:, node_idx] = self.vs[node_idx]["CPD"].sample(data)
-        data = pd.DataFrame(data, columns=[vertex["name"] for vertex in self.vs])
-        return data
+            parent_idxs = [self.get_node_index(parent) for parent in cpds[node_idx].parents]
+            data[:, node_idx] = cpds[node_idx].sample_array(data[:, parent_idxs])
+        if dtype is float:
+            return pd.DataFrame(data, columns=names)
+        return pd.DataFrame(
+            {
+                name: pd.Categorical.from_codes(
+                    codes=data[:, node_idx],
+                    dtype=pd.CategoricalDtype(cpds[node_idx].levels, ordered=True),
+                )
+                for node_idx, name in enumerate(names)
+            }
+        )
 
     def save(self, buf_path: Optional[Path] = None) -> bytes:
         """Save DAG as protobuf, or string if no path is specified."""
@@ -471,11 +705,12 @@ class DAG:
             assert isinstance(vertex["CPD"], ConditionalProbabilityTable)
             vertex["CPD"].marginalise(node)
         self.delete_vertices([node])
+        self._name_to_index = {}
 
     def remove_nodes(self, nodes: Union[List[str], igraph.VertexSeq]) -> None:
         """Remove multiple nodes (inplace), marginalising it out of any children's CPTs."""
         if isinstance(nodes, igraph.VertexSeq):
-            nodes = [node["name"] for node in nodes]
+            nodes = nodes["name"]
         for node in nodes:
             self.remove_node(node)
 
@@ -491,11 +726,13 @@ class DAG:
         """Return a copy."""
         self_copy = DAG()
         self_copy.graph = self.graph.copy()
+        self_copy._name_to_index = dict(self._name_to_index)  # pylint: disable=protected-access
         try:
-            for vertex in self_copy.graph.vs:
-                vertex["CPD"] = deepcopy(vertex["CPD"])
+            cpds = self.graph.vs["CPD"]
         except KeyError:
-            pass
+            return self_copy
+        if any(cpd is not None for cpd in cpds):
+            self_copy.graph.vs["CPD"] = [deepcopy(cpd) if cpd is not None else None for cpd in cpds]
         return self_copy
 
     def plot(self, path: Path = Path().resolve() / 'DAG.png') -> None:
@@ -518,9 +755,14 @@ class DAG:
 
         For use after classmethods from igraph.Graph which don't name nodes.
         """
-        for vertex in self.vs:
-            if vertex.attributes().get('name', None) is None:
-                vertex['name'] = _name_node(vertex.index)
+        if 'name' in self.graph.vs.attributes():
+            names = self.graph.vs['name']
+        else:
+            names = [None] * self.graph.vcount()
+        self.graph.vs['name'] = [
+            _name_node(idx) if name is None else name for idx, name in enumerate(names)
+        ]
+        self._name_to_index = {}
 
     def get_equivalence_class(self, shielded: bool = True, data: pd.DataFrame = None) -> Set[DAG]:
         """Get the Markov equivalence class of the DAG object.
@@ -531,13 +773,13 @@ class DAG:
         v_pairs = {
             vi for v in self.get_v_structures(include_shielded=shielded) for vi in get_pairs(v)
         }
-        non_v_edges = self.edges - v_pairs
-        perms = list(itertools.product([0, 1], repeat=len(non_v_edges)))
-        flip = lambda edge, f: edge if not f else (edge[1], edge[0])
+        non_v_edges = {_undirected_edge(*edge) for edge in self.edges - v_pairs}
         dags = set()
-        for perm in perms:
-            edges = {flip(edge, pi) for edge, pi in zip(non_v_edges, perm)}
-            dag = DAG.from_edges(v_pairs | edges)
+        for edges in _pdag_extensions(_nodes_sorted(list(self.nodes)), v_pairs, non_v_edges):
+            # Each edge set is unique and was checked for cycles during the search
+            dag = DAG()
+            dag.add_vertices(_nodes_sorted(list({node for edge in edges for node in edge})))
+            dag._add_edges_unchecked(list(edges))  # pylint: disable=protected-access
             if data is not None:
                 dag.estimate_parameters(data=data, infer_levels=True)
             dags.add(dag)
@@ -107,7 +107,7 @@ def ide_cozman(
             try:
                 dag_copy.add_edge(i, j)
                 dag = dag_copy
-            except AssertionError:  # added a cycle
+            except ValueError:  # added a cycle
                 continue
     return dag
 
@@ -42,9 +42,10 @@ def buf_to_dag(dag_buf: bytes, dag: Optional["baynet.DAG"] = None) -> "baynet.DA
     if dag is None:
         dag = baynet.DAG()
     dag.add_vertices([node.name for node in dag_from_buf.nodes])
+    dag.add_edges(
+        [(source, buf_node.name) for buf_node in dag_from_buf.nodes for source in buf_node.parents]
+    )
     for buf_node in dag_from_buf.nodes:
-        edges = [(source, buf_node.name) for source in buf_node.parents]
-        dag.add_edges(edges)
         node = dag.get_node(buf_node.name)
         if buf_node.variable_type == DAG_pb2.NodeType.DISCRETE:
             node["levels"] = list(buf_node.levels)
@@ -151,9 +152,9 @@ def dag_from_bif(bif: Union[Path, str]) -> 'baynet.DAG':
     dag = baynet.DAG()
     for vertex in parsed["variables"]:
         dag.add_vertex(name=vertex["name"], levels=vertex["levels"])
-    for cpt in parsed["cpts"]:
-        for parent in cpt.get("parents", []):
-            dag.add_edge(parent, cpt["variable"])
+    dag.add_edges(
+        [(parent, cpt["variable"]) for cpt in parsed["cpts"] for parent in cpt.get("parents", [])]
+    )
     for cpt in parsed["cpts"]:
         node = dag.get_node(cpt["variable"])
         node["CPD"] = ConditionalProbabilityTable(node)
@@ -39,6 +39,17 @@ def test_CPT_estimate_mle(test_dag):
     assert np.allclose(dag.vs[3]['CPD'].cumsum_array, [0.0, 1.0])
 
 
+def test_CPT_estimate_from_codes(test_dag):
+    dag = test_dag
+    dag.vs['levels'] = [["A", "B"] for _ in dag.vs]
+    codes = np.array([0, 0, 1, 1, -1])
+    parent_codes = [np.array([0, 1, 0, 1, 0]), np.array([1, 1, 1, 1, 1])]
+    cpt = ConditionalProbabilityTable.estimate_from_codes(dag.vs[1], codes, parent_codes)
+    assert cpt.parents == ['C', 'D']
+    assert np.allclose(cpt.array[:, 1], [[0.5, 0.5], [0.5, 0.5]])
+    assert np.allclose(cpt.array[:, 0], 0.5)
+
+
 def test_CPT_estimate_dfe(test_dag):
     dag = test_dag
     dag.vs['levels'] = [["A", "B"] for _ in dag.vs]
@@ -7,6 +7,7 @@ import networkx as nx
 from networkx.generators import directed
 import numpy as np
 import pandas as pd
+from pandas.api.types import is_integer_dtype
 import pytest
 
 from baynet import structure_generation
@@ -100,12 +101,69 @@ def test_DAG_edge_properties(test_dag):
     assert skeleton_dag.edges == dag.skeleton_edges == forward | backward
 
 
+def test_DAG_structure_cache(test_dag):
+    dag = test_dag
+    edges = dag.edges
+    edges.add(("A", "B"))
+    assert dag.edges == {("C", "B"), ("D", "B"), ("D", "C")}
+    assert dag.get_v_structures(True) == {("C", "B", "D")}
+    dag.add_edge("B", "A")
+    assert ("B", "A") in dag.edges
+    assert dag.get_modelstring() == "[A|B][B|C:D][C|D][D]"
+    dag.delete_edges([(2, 1)])
+    assert dag.edges == {("D", "B"), ("D", "C"), ("B", "A")}
+    assert dag.get_v_structures(True) == set()
+    dag.graph.delete_vertices([0])
+    assert dag.get_modelstring() == "[B|D][C|D][D]"
+
+
+def test_DAG_structure_cache_rename():
+    dag = DAG.from_modelstring("[A][B|A][C]")
+    assert dag.edges == {("A", "B")}
+    assert dag.get_modelstring() == "[A][B|A][C]"
+    dag.vs["name"] = ["X", "Y", "Z"]
+    assert dag.edges == {("X", "Y")}
+    assert dag.directed_edges == {("X", "Y")}
+    assert dag.get_modelstring() == "[X][Y|X][Z]"
+
+
+def test_DAG_structure_cache_same_size_change():
+    dag = DAG.from_modelstring("[A][B|A][C]")
+    assert dag.edges == {("A", "B")}
+    assert dag.get_modelstring() == "[A][B|A][C]"
+    dag.graph.delete_edges([(0, 1)])
+    dag.graph.add_edges([(2, 1)])
+    assert dag.edges == {("C", "B")}
+    assert dag.get_modelstring() == "[A][B|C][C]"
+    with pytest.raises(ValueError):
+        dag.add_edges([("C", "B")])
+
+
 def test_DAG_add_edge(test_dag):
     dag = test_dag
     dag.add_edge("B", "A")
     assert dag.edges == {("C", "B"), ("D", "B"), ("D", "C"), ("B", "A")}
 
 
+def test_DAG_add_edge_cycle(test_dag):
+    dag = test_dag
+    with pytest.raises(ValueError):
+        dag.add_edge("B", "D")
+    with pytest.raises(ValueError):
+        dag.add_edge("A", "A")
+    assert dag.edges == {("C", "B"), ("D", "B"), ("D", "C")}
+    assert dag.is_dag()
+
+
+def test_DAG_add_edges_cycle(test_dag):
+    dag = test_dag
+    with pytest.raises(ValueError):
+        dag.add_edges([("B", "A"), ("A", "D")])
+    assert dag.edges == {("C", "B"), ("D", "B"), ("D", "C")}
+    assert dag.get_modelstring() == "[A][B|C:D][C|D][D]"
+    assert dag.is_dag()
+
+
 def test_DAG_adding_duplicates(test_dag):
     dag = test_dag
     with pytest.raises(ValueError):
@@ -199,6 +257,27 @@ def test_DAG_get_node_name_or_index(test_dag):
         assert dag.get_node_index(name) == index
 
 
+def test_DAG_get_node_index_after_modification(test_dag):
+    dag = test_dag
+    assert dag.get_node_index("D") == 3
+    dag.add_vertices(["E", "F"])
+    assert dag.get_node_index("F") == 5
+    dag.delete_vertices([0])
+    assert dag.get_node_index("D") == 2
+    assert dag.get_node_index("F") == 4
+    with pytest.raises(ValueError):
+        dag.get_node_index("A")
+
+
+def test_DAG_add_vertices_with_attributes():
+    dag = DAG()
+    dag.add_vertices(["A", "B"], {"levels": [["0", "1"], ["0", "1", "2"]]})
+    assert dag.vs["levels"] == [["0", "1"], ["0", "1", "2"]]
+    assert dag.get_node_index("B") == 1
+    dag.add_vertices(["C"], attributes={"levels": [["0", "1"]]})
+    assert dag.get_node("C")["levels"] == ["0", "1"]
+
+
 def test_DAG_are_neighbours(test_dag):
     dag = test_dag
     a, b, c, d = dag.vs
@@ -335,6 +414,7 @@ def test_DAG_estimate_parameters_infer(test_dag):
     with pytest.raises(ValueError):
         dag.estimate_parameters(data.astype(bool), method="mle", infer_levels=True)
     dag.estimate_parameters(data, method="mle", infer_levels=True)
+    assert all(is_integer_dtype(dtype) for dtype in data.dtypes), "Input data was modified"
     assert np.array_equal(dag.vs[0]['CPD'].cumsum_array, [0.5, 1.0])
     assert np.array_equal(dag.vs[1]['CPD'].cumsum_array, [[[0.5, 1.0]]])
     assert np.array_equal(dag.vs[2]['CPD'].cumsum_array, [[1.0]])
@@ -540,6 +620,12 @@ def test_copy(test_dag):
     assert dag.nodes == dag_copy.nodes
     assert dag.edges == dag_copy.edges
 
+    dag.generate_discrete_parameters(seed=1)
+    dag_copy = dag.copy()
+    for vertex, vertex_copy in zip(dag.vs, dag_copy.vs):
+        assert vertex["CPD"] is not vertex_copy["CPD"]
+        assert np.array_equal(vertex["CPD"].array, vertex_copy["CPD"].array)
+
 
 def test_getattribute(test_dag):
     with pytest.raises(AttributeError):
@@ -547,6 +633,9 @@ def test_getattribute(test_dag):
     assert isinstance(test_dag.vs, igraph.VertexSeq)
     assert isinstance(test_dag.es, igraph.EdgeSeq)
     assert isinstance(test_dag.as_directed(), DAG)
+    assert test_dag.vcount() == 4
+    test_dag.graph = igraph.Graph(2, directed=True)
+    assert test_dag.vcount() == 2
 
 
 def test_equivalence_class():
@@ -561,3 +650,18 @@ def test_equivalence_class():
     assert output_modelstrings == {
         output.get_modelstring() for output in dag.get_equivalence_class()
     }
+
+
+def test_equivalence_class_no_new_v_structures():
+    dag = DAG.from_modelstring("[A][B|A][C|B]")
+    assert {output.get_modelstring() for output in dag.get_equivalence_class()} == {
+        "[A][B|A][C|B]",
+        "[A|B][B][C|B]",
+        "[A|B][B|C][C]",
+    }
+
+
+def test_equivalence_class_shielded():
+    dag = DAG.from_modelstring("[A][B|A][C|A:B]")
+    assert len(dag.get_equivalence_class(shielded=True)) == 2
+    assert len(dag.get_equivalence_class(shielded=False)) == 6